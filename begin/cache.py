@@ -0,0 +1,105 @@
+"Persistent on-disk caches used to speed up program start"
+import os
+import sys
+
+__all__ = ['directory', 'fingerprint', 'load', 'store']
+
+
+def directory():
+    """Directory used to store begins caches
+
+    The 'BEGIN_CACHE_DIR' environment variable overrides the default location,
+    setting it to an empty string disables caching. Otherwise caches are kept
+    in a 'begins' directory within the user's cache directory. Returns None if
+    caching is disabled.
+    """
+    path = os.environ.get('BEGIN_CACHE_DIR')
+    if path is not None:
+        return path if len(path) > 0 else None
+    base = os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'begins')
+
+
+def fingerprint(*parts):
+    "Generate hex digest identifying a cache key from its parts"
+    import hashlib
+    digest = hashlib.sha1()
+    for part in (sys.version,) + parts:
+        digest.update(repr(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load(name, key, codec=None):
+    """Load cached value if stored with matching key
+
+    Returns None if caching is disabled, no value is cached, the cached value
+    was stored using a different key or the cache file can not be decoded.
+    """
+    codec = _codec(codec)
+    path = _path(name)
+    if path is None:
+        return None
+    try:
+        with open(path, 'rb') as cached:
+            stored_key, value = codec.loads(cached.read())
+    except Exception:
+        return None
+    if stored_key != key:
+        return None
+    return value
+
+
+def store(name, key, value, codec=None):
+    """Store value in the cache using key
+
+    The cache file is replaced atomically, so concurrently starting programs
+    never read a partially written file. Values that can not be encoded and
+    failure to write the cache are silently ignored.
+    """
+    import tempfile
+    codec = _codec(codec)
+    path = _path(name)
+    if path is None:
+        return
+    try:
+        data = codec.dumps([key, value])
+    except Exception:
+        return
+    if not isinstance(data, bytes):
+        data = data.encode('utf-8')
+    try:
+        dirname = os.path.dirname(path)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        handle, temppath = tempfile.mkstemp(dir=dirname, prefix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as temp:
+                temp.write(data)
+            _replace(temppath, path)
+        except Exception:
+            os.remove(temppath)
+            raise
+    except (OSError, IOError):
+        pass
+
+
+def _codec(codec):
+    if codec is None:
+        import json as codec
+    return codec
+
+
+def _path(name):
+    dirname = directory()
+    if dirname is None:
+        return None
+    return os.path.join(dirname, name)
+
+
+def _replace(source, destination):
+    try:
+        os.replace(source, destination)
+    except AttributeError:
+        os.rename(source, destination)
@@ -3,23 +3,30 @@ import argparse
 import os
 import sys
 
-try:
-    import configparser
-except ImportError:
-    import ConfigParser as configparser
-
 try:
     from inspect import signature
 except ImportError:
     from funcsigs import signature
 
-from begin import context, extensions, subcommands, utils
+from begin import cache, context, extensions, subcommands, utils
+from begin.timings import Timings
+from begin.version import __version__
 
 __all__ = ['create_parser', 'populate_parser',
            'apply_options', 'call_function']
 
 
-NODEFAULT = object()
+class _NoDefault(object):
+    "Marker for command line options without a default value"
+
+    def __repr__(self):
+        return 'NODEFAULT'
+
+    def __reduce__(self):
+        return 'NODEFAULT'
+
+
+NODEFAULT = _NoDefault()
 
 
 class CommandLineError(ValueError):
@@ -36,9 +43,16 @@ class DefaultsManager(object):
     def __init__(self, env_prefix=None, config_file=None, config_section=None):
         self._use_env = env_prefix is not None
         self._prefix = '' if not self._use_env else env_prefix
-        self._parser = configparser.ConfigParser()
+        self._parser = None
         self._section = config_section
         if config_file is not None:
+            try:
+                import configparser
+            except ImportError:
+                import ConfigParser as configparser
+            self._errors = (configparser.NoSectionError,
+                    configparser.NoOptionError)
+            self._parser = configparser.ConfigParser()
             self._parser.read([config_file,
                 os.path.join(os.path.expanduser('~'), config_file)])
 
@@ -56,11 +70,11 @@ class DefaultsManager(object):
 
     def from_name(self, name, default=NODEFAULT, section=None):
         "Get default value from argument name"
-        if len(self._parser.sections()) > 0:
+        if self._parser is not None and len(self._parser.sections()) > 0:
             section = self._section if section is None else section
             try:
                 default = self._parser.get(section, name)
-            except (configparser.NoSectionError, configparser.NoOptionError):
+            except self._errors:
                 pass
         if self._use_env:
             default = os.environ.get(self.metavar(name), default)
@@ -70,6 +84,37 @@ class DefaultsManager(object):
         self._section = section
 
 
+class LazySubParsersAction(argparse._SubParsersAction):
+    """Sub-parsers action that populates sub-command parsers on first use
+
+    Sub-command parsers are created with only their name, help and
+    description. The callable registered for a sub-command is used to populate
+    its parser the first time the sub-command is selected from the command
+    line.
+    """
+
+    def __init__(self, *args, **kwargs):
+        argparse._SubParsersAction.__init__(self, *args, **kwargs)
+        self._populators = {}
+
+    def add_lazy_parser(self, name, populate, **kwargs):
+        "Add sub-command parser to be populated when first used"
+        parser = self.add_parser(name, **kwargs)
+        self._populators[name] = populate
+        return parser
+
+    def populate(self, name):
+        "Populate a sub-command parser if it has not already been populated"
+        populate = self._populators.pop(name, None)
+        if populate is not None:
+            populate(self._name_parser_map[name])
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        self.populate(values[0])
+        argparse._SubParsersAction.__call__(self, parser, namespace, values,
+                option_string)
+
+
 def program_name(filename, func):
     """Choose program name for application
 
@@ -152,7 +197,8 @@ def populate_parser(parser, defaults, funcsig, short_args, lexical_order):
 
 def create_parser(func, env_prefix=None, config_file=None, config_section=None,
         short_args=True, lexical_order=False, sub_group=None, plugins=None,
-        collector=None, formatter_class=argparse.HelpFormatter):
+        collector=None, formatter_class=argparse.HelpFormatter,
+        lazy_subcommands=False, parser_cache=False, timings=None):
     """Create and OptionParser object from a function definition.
 
     Use the function's signature to generate an OptionParser object. Default
@@ -162,8 +208,41 @@ def create_parser(func, env_prefix=None, config_file=None, config_section=None,
     ingored but will alter the program's usage string. Variable keyword
     arguments will raise a ValueError exception. A prefix on expected
     environment variables can be added using the env_prefix argument.
+
+    If lazy_subcommands is True, only the name and help for each sub-command
+    is added when the parser is created. A sub-command's options are added
+    when it is selected on the command line.
+
+    If parser_cache is True, the generated parser is stored in the begins
+    cache directory and reused by later calls. The cached parser is
+    invalidated by changes to the source files of the function, its
+    extensions and sub-commands, the configuration files and environment
+    variables used for default values and the arguments to this function.
+
+    Loading plugins and reading default values are timed using the timings
+    argument, if provided.
     """
-    defaults = DefaultsManager(env_prefix, config_file, func.__name__)
+    def populator(subfunc):
+        def populate(subparser):
+            defaults.set_config_section(subfunc.__name__)
+            populate_parser(subparser, defaults, signature(subfunc),
+                    short_args, lexical_order)
+        return populate
+    timings = timings if timings is not None else Timings()
+    section = func.__name__ if config_section is None else config_section
+    collector = collector if collector is not None else subcommands.COLLECTORS[sub_group]
+    if plugins is not None:
+        with timings.phase('plugins'):
+            collector.load_plugins(plugins)
+    if parser_cache:
+        name, key = _parser_cache_key(func, collector, env_prefix, config_file,
+                section, short_args, lexical_order, formatter_class)
+        codec = _ParserCodec(formatter_class)
+        parser = cache.load(name, key, codec=codec)
+        if parser is not None:
+            return parser
+    with timings.phase('defaults'):
+        defaults = DefaultsManager(env_prefix, config_file, section)
     parser = argparse.ArgumentParser(
             prog=program_name(sys.argv[0], func),
             argument_default=NODEFAULT,
@@ -171,22 +250,20 @@ def create_parser(func, env_prefix=None, config_file=None, config_section=None,
             description = func.__doc__,
             formatter_class=formatter_class
     )
-    collector = collector if collector is not None else subcommands.COLLECTORS[sub_group]
-    if plugins is not None:
-        collector.load_plugins(plugins)
     if len(collector) > 0:
         subparsers = parser.add_subparsers(title='Available subcommands',
-                dest='_subcommand')
+                dest='_subcommand', action=LazySubParsersAction)
         for subfunc in collector.commands():
-            funcsig  = signature(subfunc)
             help = None
             if subfunc.__doc__ is not None:
                 help = subfunc.__doc__.splitlines()[0]
-            subparser = subparsers.add_parser(subfunc.__name__, help=help,
-                    conflict_handler='resolve', description=subfunc.__doc__,
+            subparsers.add_lazy_parser(subfunc.__name__, populator(subfunc),
+                    help=help, conflict_handler='resolve',
+                    description=subfunc.__doc__,
                     formatter_class=formatter_class)
-            defaults.set_config_section(subfunc.__name__)
-            populate_parser(subparser, defaults, funcsig, short_args, lexical_order)
+            if not lazy_subcommands or parser_cache:
+                subparsers.populate(subfunc.__name__)
+        defaults.set_config_section(section)
     have_extensions = False
     while hasattr(func, '__wrapped__') and not hasattr(func, '__signature__'):
         if isinstance(func, extensions.Extension):
@@ -195,9 +272,192 @@ def create_parser(func, env_prefix=None, config_file=None, config_section=None,
         func = getattr(func, '__wrapped__')
     funcsig = signature(func)
     populate_parser(parser, defaults, funcsig, short_args, lexical_order)
+    if parser_cache:
+        cache.store(name, key, parser, codec=codec)
     return parser
 
 
+class _ParserCodec(object):
+    """Pickle command line parsers for the parser cache
+
+    The help formatter class may be dynamically generated, and argparse
+    registers a locally defined type function with every parser, so both are
+    replaced with persistent references while pickling.
+    """
+
+    def __init__(self, formatter_class):
+        self._formatter_class = formatter_class
+
+    def dumps(self, obj):
+        import io
+        import pickle
+        formatter_class = self._formatter_class
+        class Pickler(pickle.Pickler):
+            def persistent_id(self, obj):
+                if obj is formatter_class:
+                    return 'formatter_class'
+                if getattr(obj, '__name__', None) == 'identity' and \
+                        getattr(obj, '__module__', None) == 'argparse':
+                    return 'identity'
+                return None
+        buf = io.BytesIO()
+        Pickler(buf, pickle.HIGHEST_PROTOCOL).dump(obj)
+        return buf.getvalue()
+
+    def loads(self, data):
+        import io
+        import pickle
+        references = {
+            'formatter_class': self._formatter_class,
+            'identity': _identity,
+        }
+        class Unpickler(pickle.Unpickler):
+            def persistent_load(self, pid):
+                return references[pid]
+        return Unpickler(io.BytesIO(data)).load()
+
+
+def _identity(value):
+    return value
+
+
+def _parser_cache_key(func, collector, *options):
+    """Generate cache file name and key for a function's parser
+
+    The file name identifies the function, the key identifies everything else
+    used to create the parser.
+    """
+    def source(obj):
+        module = sys.modules.get(getattr(obj, '__module__', None))
+        filename = getattr(module, '__file__', None)
+        return (filename, _mtime(filename))
+    sources = []
+    target = func
+    while hasattr(target, '__wrapped__') and not hasattr(target, '__signature__'):
+        sources.append(source(target))
+        target = getattr(target, '__wrapped__')
+    sources.append(source(target))
+    commands = [(name, source(subfunc)) for name, subfunc in sorted(collector.items())]
+    env_prefix, config_file = options[:2]
+    configs = []
+    if config_file is not None:
+        for path in (config_file, os.path.join(os.path.expanduser('~'), config_file)):
+            path = os.path.abspath(path)
+            configs.append((path, _mtime(path)))
+    environ = []
+    if env_prefix is not None:
+        prefix = env_prefix.upper()
+        environ = sorted(item for item in os.environ.items()
+                if item[0].startswith(prefix))
+    formatter = [cls.__module__ + '.' + cls.__name__
+            for cls in getattr(options[-1], '__mro__', ())]
+    name = 'parser-{0}.pickle'.format(cache.fingerprint(
+        getattr(target, '__module__', None), func.__name__,
+        os.path.abspath(sys.argv[0])))
+    key = cache.fingerprint(__version__, sys.argv[0], sources, commands,
+            configs, environ, options[:-1], formatter)
+    return name, key
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except (OSError, TypeError):
+        return None
+
+
+_MISSING = object()
+_POSITIONAL, _VARIADIC, _KEYWORD = range(3)
+
+
+class Invocation(object):
+    """Precompiled plan for calling a function with command line options
+
+    The function's signature is reduced to a sequence of steps, each naming
+    the option to extract and how it is passed to the function. Calling the
+    invocation with an options object only executes these steps.
+    """
+
+    __slots__ = ('func', 'signature', 'steps')
+
+    def __init__(self, func, funcsig):
+        steps = []
+        for param in funcsig.parameters.values():
+            if param.kind == param.POSITIONAL_OR_KEYWORD or \
+                    param.kind == param.POSITIONAL_ONLY:
+                steps.append((param.name, _POSITIONAL))
+            elif param.kind == param.VAR_POSITIONAL:
+                steps.append((param.name, _VARIADIC))
+            elif param.kind == param.KEYWORD_ONLY:
+                steps.append((param.name, _KEYWORD))
+            elif param.kind == param.VAR_KEYWORD:
+                msg = 'Variable length keyword arguments not supported'
+                raise CommandLineError(msg)
+        self.func = func
+        self.signature = funcsig
+        self.steps = tuple(steps)
+
+    def __call__(self, opts):
+        pargs = []
+        kwargs = {}
+        for name, kind in self.steps:
+            value = getattr(opts, name, _MISSING)
+            if value is _MISSING:
+                msg = "Missing command line options '{0}'".format(name)
+                raise CommandLineError(msg)
+            if kind == _VARIADIC:
+                pargs.extend([] if value is NODEFAULT else value)
+                continue
+            if value is NODEFAULT:
+                msg = "'{0}' is a required option{1}".format(name, os.linesep)
+                sys.stderr.write(msg)
+                sys.exit(1)
+            if kind == _POSITIONAL:
+                pargs.append(value)
+            else:
+                kwargs[name] = value
+        return self.func(*pargs, **kwargs)
+
+
+class InvocationPlan(object):
+    """Precompiled plan for applying command line options to a program
+
+    Resolves the extensions wrapping the program's function, the signature of
+    the wrapped function and invocations for each sub-command once, so that
+    applying options only needs to execute the plan. Sub-command invocations
+    are compiled when first used unless eager is True.
+    """
+
+    def __init__(self, func, collector, eager=True):
+        exts = []
+        target = func
+        while hasattr(target, '__wrapped__') and not hasattr(target, '__signature__'):
+            if isinstance(target, extensions.Extension):
+                exts.append(target)
+            target = getattr(target, '__wrapped__')
+        self.extensions = tuple(exts)
+        self.main = Invocation(func, signature(target))
+        self._collector = collector
+        self._subcommands = {}
+        if eager:
+            for name in collector:
+                self.subcommand(name)
+
+    def run_extensions(self, opts):
+        "Run extensions using command line options"
+        for ext in self.extensions:
+            ext.run(opts)
+
+    def subcommand(self, name):
+        "Invocation for a named sub-command"
+        invocation = self._subcommands.get(name)
+        if invocation is None:
+            subfunc = self._collector.get(name)
+            invocation = Invocation(subfunc, signature(subfunc))
+            self._subcommands[name] = invocation
+        return invocation
+
+
 def call_function(func, funcsig, opts):
     """Call function using command line options and arguments
 
@@ -207,54 +467,34 @@ def call_function(func, funcsig, opts):
     options object or to failure to use the command line arguments list will
     result in a CommandLineError being raised.
     """
-    def getoption(opts, name, default=None):
-        if not hasattr(opts, name):
-            msg = "Missing command line options '{0}'".format(name)
-            raise CommandLineError(msg)
-        value = getattr(opts, name)
-        if value is NODEFAULT:
-            if default is None:
-                msg = "'{0}' is a required option{1}".format(name, os.linesep)
-                sys.stderr.write(msg)
-                sys.exit(1)
-            else:
-                value = default
-        return value
-    pargs = []
-    kwargs = {}
-    for param in funcsig.parameters.values():
-        if param.kind == param.POSITIONAL_OR_KEYWORD or \
-                param.kind == param.POSITIONAL_ONLY:
-            pargs.append(getoption(opts, param.name))
-        elif param.kind == param.VAR_POSITIONAL:
-            pargs.extend(getoption(opts, param.name, []))
-        elif param.kind == param.KEYWORD_ONLY:
-            kwargs[param.name] = getoption(opts, param.name)
-        elif param.kind == param.VAR_KEYWORD:
-            msg = 'Variable length keyword arguments not supported'
-            raise CommandLineError(msg)
-    return func(*pargs, **kwargs)
+    return Invocation(func, funcsig)(opts)
 
 
-def apply_options(func, opts, run_main=True, sub_group=None, collector=None):
+def apply_options(func, opts, run_main=True, sub_group=None, collector=None,
+        timings=None, plan=None):
     """Apply command line options to function and subcommands
 
     Call the target function, and any chosen subcommands, using the parsed
-    command line arguments.
+    command line arguments. Running extensions, the target function and the
+    subcommand are timed using the timings argument, if provided. A
+    precompiled InvocationPlan for the function may be passed using the plan
+    argument, otherwise one is compiled for this call.
     """
-    ext = func
-    collector = collector if collector is not None else subcommands.COLLECTORS[sub_group]
-    while hasattr(ext, '__wrapped__') and not hasattr(ext, '__signature__'):
-        if isinstance(ext, extensions.Extension):
-            ext.run(opts)
-        ext = getattr(ext, '__wrapped__')
+    timings = timings if timings is not None else Timings()
+    if plan is None:
+        collector = collector if collector is not None else subcommands.COLLECTORS[sub_group]
+        plan = InvocationPlan(func, collector, eager=False)
+    with timings.phase('extensions'):
+        plan.run_extensions(opts)
     if run_main:
-        with context:
-            return_value = call_function(func, signature(ext), opts)
+        with timings.phase('main'):
+            with context:
+                return_value = plan.main(opts)
         context.return_values += (return_value,)
     if hasattr(opts, '_subcommand'):
-        subfunc = collector.get(opts._subcommand)
-        with context:
-            return_value = call_function(subfunc, signature(subfunc), opts)
+        invocation = plan.subcommand(opts._subcommand)
+        with timings.phase('subcommand'):
+            with context:
+                return_value = invocation(opts)
         context.return_values += (return_value,)
     return context.last_return
@@ -14,7 +14,8 @@ class SwizzleContext(object):
         'opts_current': None,
         'opts_next': tuple(),
         'opts_previous': tuple(),
-        'return_values': tuple()
+        'return_values': tuple(),
+        'timings': tuple()
     }
 
     def __enter__(self):
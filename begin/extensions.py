@@ -1,8 +1,8 @@
-"Command line extension plugins"
-import cgitb
-import logging
-import logging.handlers
-import platform
+"""Command line extension plugins
+
+Modules configured by extensions are imported when an extension is run, so
+programs only pay the cost of importing them when they are used.
+"""
 import sys
 
 from begin.wrappable import Wrapping
@@ -49,6 +49,7 @@ class Tracebacks(Extension):
         "Configure cgitb module if enabled on command line"
         if not opts.tracebacks:
             return
+        import cgitb
         cgitb.enable(logdir=opts.tbdir, format='txt')
 
 
@@ -89,6 +90,9 @@ class Logging(Extension):
 
     def run(self, opts):
         "Configure logging module according to command line options"
+        import logging
+        import logging.handlers
+        import platform
         # log level
         level = logging.INFO
         if opts.loglvl is not None:
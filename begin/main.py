@@ -1,15 +1,21 @@
 "Syntactic sugar for a programs 'main'."
 from __future__ import absolute_import, division, print_function
+import collections
 import inspect
 import itertools
+import os
 import sys
 
+from begin.timings import Timings
 from begin.wrappable import Wrapping
-from begin import cmdline, context, convert
+from begin import cmdline, context, convert, timings
 
 __all__ = ['start']
 
 
+BatchResult = collections.namedtuple('BatchResult', ['args', 'value', 'error'])
+
+
 class Program(Wrapping):
     """Decorate the starting command of command line application
 
@@ -20,14 +26,23 @@ class Program(Wrapping):
 
     def __init__(self, func, auto_convert=False, cmd_delim=None,
             sub_group=None, collector=None, **kwargs):
+        self._timings = Timings()
+        self._timings.record('import', timings.IMPORTED)
         if auto_convert:
             func = convert(_automatic=True)(func)
         Wrapping.__init__(self, func)
         self._cmd_delim = cmd_delim
         self._group = sub_group
         self._collector = collector
-        self._parser = cmdline.create_parser(func, sub_group=self._group,
-                collector=self._collector, **kwargs)
+        with self._timings.phase('create_parser'):
+            self._parser = cmdline.create_parser(func, sub_group=self._group,
+                    collector=self._collector, timings=self._timings, **kwargs)
+        with self._timings.phase('plan'):
+            collector = self._collector
+            if collector is None:
+                collector = cmdline.subcommands.COLLECTORS[self._group]
+            self._plan = cmdline.InvocationPlan(func, collector,
+                    eager=not kwargs.get('lazy_subcommands', False))
 
     def start(self, args=None):
         """Begin command line program
@@ -35,15 +50,98 @@ class Program(Wrapping):
         By default will use the command line arguments passed when Python was
         initially started. New arguments can be passed through the args
         parameter.
+
+        The time taken by each phase of starting the program is recorded in
+        'context.timings'. Passing '--begin-timings' on the command line, or
+        setting the 'BEGIN_TIMINGS' environment variable, will also report
+        these timings on stderr.
+
+        Passing '--begin-serve SOCKET' keeps the program resident, serving
+        command lines received on a Unix domain socket. See 'serve()'.
+
+        Passing '--begin-batch FILE' runs the program once for each line of
+        FILE, or standard input if FILE is '-'. See 'start_many()'.
+        """
+        args = list(args) if args is not None else sys.argv[1:]
+        address = _control_option(args, '--begin-serve')
+        if address is not None:
+            return self.serve(address)
+        batch = _control_option(args, '--begin-batch')
+        report = _control_flag(args, '--begin-timings') or \
+                len(os.environ.get('BEGIN_TIMINGS', '')) > 0
+        timings = Timings(self._timings.phases)
+        try:
+            if batch is not None:
+                return self._start_batch(batch, args)
+            return self._run(args, timings)
+        finally:
+            context.timings = tuple(timings.phases)
+            if report:
+                timings.report(sys.stderr)
+
+    def start_many(self, commands):
+        """Begin command line program for each command line in an iterable
+
+        Each item is a sequence of command line arguments, as would be passed
+        to 'start()'. The parser and invocation plan are reused for every
+        command line, and command lines are consumed lazily. Yields a
+        BatchResult of the arguments, the return value and any error for each
+        command line. Errors, including parser errors and calls to sys.exit(),
+        are reported through the result instead of stopping the batch.
+        """
+        for args in commands:
+            args = list(args)
+            try:
+                value = self._run(args, Timings())
+            except (Exception, SystemExit) as err:
+                yield BatchResult(args, None, err)
+            else:
+                yield BatchResult(args, value, None)
+
+    def _start_batch(self, filename, prefix):
+        """Start program for each line of a file, exiting on any failures
+
+        Lines are split using shell syntax, with blank lines and comments
+        ignored. Any remaining command line arguments are used as a prefix for
+        every line.
         """
+        import shlex
+        stream = sys.stdin if filename == '-' else open(filename)
+        position = [0]
+        def commands():
+            for lineno, line in enumerate(stream, 1):
+                args = shlex.split(line, comments=True)
+                if len(args) > 0:
+                    position[0] = lineno
+                    yield prefix + args
+        failures = 0
+        try:
+            for result in self.start_many(commands()):
+                if result.error is None:
+                    continue
+                failures += 1
+                error = result.error
+                if isinstance(error, SystemExit):
+                    error = 'exit status {0}'.format(error.code)
+                msg = "{0}:{1}: {2}{3}".format(filename, position[0], error,
+                        os.linesep)
+                sys.stderr.write(msg)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        if failures > 0:
+            sys.exit(1)
+
+    def _run(self, args, timings):
+        "Parse command line arguments and apply them to the program"
         commands = [[]]
-        args = args if args is not None else sys.argv[1:]
         if len(args) > 0:
             commands = [list(group) for key, group in itertools.groupby(args, lambda x: x == self._cmd_delim) if not key]
         options = []
-        for command in commands:
-            opts = self._parser.parse_args(command)
-            options.append(opts)
+        with timings.phase('parse_args'):
+            for command in commands:
+                opts = self._parser.parse_args(command)
+                options.append(opts)
         context.clear()
         context.opts_next = tuple(options)
         for count, opts in enumerate(options):
@@ -51,11 +149,54 @@ class Program(Wrapping):
             context.opts_current = opts
             cmdline.apply_options(self.__wrapped__, opts,
                     run_main=(count==0), sub_group=self._group,
-                    collector=self._collector)
+                    collector=self._collector, timings=timings,
+                    plan=self._plan)
             context.opts_previous += (opts,)
         context.opts_current = None
         return context.last_return
 
+    def serve(self, address):
+        """Serve command lines for this program on a Unix domain socket
+
+        The program stays resident with its parser built. Each command line
+        received from a client, sent using 'python -m begin.serve SOCKET
+        [ARGS ...]', is started in a forked child process using the client's
+        environment, working directory and standard file descriptors. Runs
+        until interrupted.
+        """
+        from begin import serve
+        serve.serve(self, address)
+
+
+def _control_flag(args, flag):
+    """Remove a begins control flag from command line arguments
+
+    Control flags alter how begins starts a program and are never passed to
+    the program's parser. Returns True if the flag was present.
+    """
+    if flag not in args:
+        return False
+    while flag in args:
+        args.remove(flag)
+    return True
+
+
+def _control_option(args, option):
+    """Remove a begins control option and its value from command line arguments
+
+    Returns the option's value, or None if the option was not present.
+    """
+    if option not in args:
+        return None
+    index = args.index(option)
+    if index + 1 >= len(args):
+        msg = "{0}: expected one argument{1}".format(option, os.linesep)
+        sys.stderr.write(msg)
+        sys.exit(2)
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
+
 
 def start(func=None, **kwargs):
     """Return True if called in a module that is executed.
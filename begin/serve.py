@@ -0,0 +1,188 @@
+"""Serve command lines for a resident begins program
+
+A program started with '--begin-serve SOCKET' creates its parser and then
+listens on a Unix domain socket instead of running. Clients forward their
+command line arguments, environment, working directory and standard file
+descriptors over the socket. Each request is run in a forked child process,
+so imported modules stay warm while requests remain isolated from each other.
+The program's exit code is relayed back to the client.
+
+Use 'python -m begin.serve SOCKET [ARGS ...]' as the client.
+"""
+from __future__ import absolute_import, division, print_function
+import array
+import errno
+import io
+import json
+import os
+import socket
+import struct
+import sys
+import traceback
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+__all__ = ['serve', 'make_server', 'request']
+
+_LENGTH = struct.Struct('!I')
+_STATUS = struct.Struct('!i')
+_FDS = 3
+
+
+class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    "Unix domain socket server running each request in a forked child"
+
+    def __init__(self, address, program):
+        self.program = program
+        socketserver.UnixStreamServer.__init__(self, address, _Handler)
+
+    def process_request(self, request, client_address):
+        # avoid duplicating buffered output in the child process
+        sys.stdout.flush()
+        sys.stderr.flush()
+        socketserver.ForkingMixIn.process_request(self, request,
+                client_address)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        message, fds = _receive(self.request)
+        status = _run(self.server.program, message, fds)
+        self.request.sendall(_STATUS.pack(status))
+
+
+def make_server(program, address):
+    """Create server for a program listening on a Unix domain socket
+
+    A stale socket file left by a server that is no longer running is
+    replaced. Raises socket.error if another server is using the address.
+    """
+    if os.path.exists(address):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(address)
+        except socket.error as err:
+            if err.errno != errno.ECONNREFUSED:
+                raise
+            os.remove(address)
+        else:
+            msg = "Address '{0}' is already being served".format(address)
+            raise socket.error(errno.EADDRINUSE, msg)
+        finally:
+            probe.close()
+    return Server(address, program)
+
+
+def serve(program, address):
+    "Serve a program's command lines until interrupted"
+    server = make_server(program, address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(address):
+            os.remove(address)
+
+
+def request(address, args, env=None, cwd=None, fds=(0, 1, 2)):
+    """Run command line arguments using a program served on address
+
+    The environment and working directory default to those of the current
+    process. The given file descriptors become the standard input, output and
+    error of the program. Returns the program's exit code.
+    """
+    env = dict(os.environ if env is None else env)
+    cwd = os.getcwd() if cwd is None else cwd
+    payload = json.dumps({'args': list(args), 'env': env, 'cwd': cwd})
+    payload = payload.encode('utf-8')
+    data = _LENGTH.pack(len(payload)) + payload
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(address)
+        rights = array.array('i', fds)
+        sent = sock.sendmsg([data],
+                [(socket.SOL_SOCKET, socket.SCM_RIGHTS, rights)])
+        sock.sendall(data[sent:])
+        status = _recv_exactly(sock, _STATUS.size)
+    finally:
+        sock.close()
+    if len(status) < _STATUS.size:
+        # child process died without reporting a status
+        return 1
+    return _STATUS.unpack(status)[0]
+
+
+def _receive(sock):
+    "Receive a request's message and file descriptors"
+    size = socket.CMSG_LEN(_FDS * array.array('i').itemsize)
+    data, ancillary, flags, address = sock.recvmsg(_LENGTH.size, size)
+    fds = array.array('i')
+    for level, kind, cmsg in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(cmsg[:len(cmsg) - (len(cmsg) % fds.itemsize)])
+    data += _recv_exactly(sock, _LENGTH.size - len(data))
+    length = _LENGTH.unpack(data)[0]
+    message = json.loads(_recv_exactly(sock, length).decode('utf-8'))
+    return message, list(fds)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(size)
+        if len(chunk) == 0:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def _run(program, message, fds):
+    "Run a request in the current process, returning the exit code"
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    # standard streams may have been replaced, so bind them to the client's
+    sys.stdin = io.open(0, 'r', closefd=False)
+    sys.stdout = io.open(1, 'w', closefd=False)
+    sys.stderr = io.open(2, 'w', buffering=1, closefd=False)
+    os.chdir(message['cwd'])
+    os.environ.clear()
+    os.environ.update(message['env'])
+    sys.argv = sys.argv[:1] + message['args']
+    try:
+        program.start(message['args'])
+        status = 0
+    except SystemExit as exc:
+        status = _exit_status(exc.code)
+    except KeyboardInterrupt:
+        status = 1
+    except Exception:
+        traceback.print_exc()
+        status = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return status
+
+
+def _exit_status(code):
+    "Convert SystemExit code to exit status as the interpreter would"
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    sys.stderr.write('{0}\n'.format(code))
+    return 1
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.stderr.write('usage: python -m begin.serve SOCKET [ARGS ...]\n')
+        sys.exit(2)
+    sys.exit(request(sys.argv[1], sys.argv[2:]))
@@ -1,12 +1,16 @@
 "Subcommand support for command lines"
 from collections import defaultdict
+import os
+import sys
 
 try:
     from collections.abc import MutableMapping
 except ImportError:
     from collections import MutableMapping
 
-import pkg_resources
+from begin import cache
+
+_ENTRY_POINTS = None
 
 
 class Collector(dict):
@@ -17,8 +21,8 @@ class Collector(dict):
             yield self[name]
 
     def load_plugins(self, entry_point):
-        for func in pkg_resources.iter_entry_points(group=entry_point):
-            self.register(func)
+        for name, value in entry_points(entry_point):
+            self.register(load_entry_point(value))
 
     def register(self, func, name=None):
         name = func.__name__ if name is None else name
@@ -44,4 +48,65 @@ def subcommand(func=None, name=None, group=None, collector=None):
     return wrapper
 
 
+def entry_points(group):
+    """Find entry points for a group from installed distributions
+
+    Returns a list of (name, value) pairs. Scanning installed distributions is
+    slow, so an index of all entry points is cached on disk. The cached index
+    is discarded if the modification time of any directory on 'sys.path'
+    changes, which happens when distributions are installed or removed.
+    """
+    global _ENTRY_POINTS
+    key = cache.fingerprint(_path_mtimes())
+    if _ENTRY_POINTS is None or _ENTRY_POINTS[0] != key:
+        index = cache.load('entry_points.json', key)
+        if index is None:
+            index = _scan_entry_points()
+            cache.store('entry_points.json', key, index)
+        _ENTRY_POINTS = (key, index)
+    return [tuple(entry) for entry in _ENTRY_POINTS[1].get(group, [])]
+
+
+def load_entry_point(value):
+    "Import the object referenced by an entry point's 'module:attr' value"
+    import importlib
+    module, _, attrs = value.partition(':')
+    target = importlib.import_module(module.strip())
+    for attr in attrs.split('[')[0].strip().split('.'):
+        if len(attr) > 0:
+            target = getattr(target, attr)
+    return target
+
+
+def _path_mtimes():
+    mtimes = []
+    for path in sys.path:
+        path = os.path.abspath(path or os.curdir)
+        try:
+            mtimes.append((path, os.stat(path).st_mtime))
+        except OSError:
+            mtimes.append((path, None))
+    return mtimes
+
+
+def _scan_entry_points():
+    index = {}
+    try:
+        from importlib import metadata
+    except ImportError:
+        import pkg_resources
+        for dist in pkg_resources.working_set:
+            for group, entries in dist.get_entry_map().items():
+                for name, entry in entries.items():
+                    value = str(entry).partition('=')[2].strip()
+                    index.setdefault(group, []).append([name, value])
+        return index
+    found = metadata.entry_points()
+    if isinstance(found, dict):
+        found = [entry for group, entries in found.items() for entry in entries]
+    for entry in found:
+        index.setdefault(entry.group, []).append([entry.name, entry.value])
+    return index
+
+
 COLLECTORS = defaultdict(Collector)
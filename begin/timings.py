@@ -0,0 +1,78 @@
+"Timing of program start up phases"
+import collections
+import time
+
+__all__ = ['Phase', 'Timings']
+
+try:
+    clock = time.perf_counter
+except AttributeError:
+    clock = time.time
+
+# time the begin package was first imported
+IMPORTED = clock()
+
+
+class Phase(collections.namedtuple('Phase', ['name', 'start', 'end'])):
+    """Start and end timestamps for a phase of program start up
+
+    Timestamps are taken from a monotonic clock, so only differences between
+    timestamps are meaningful.
+    """
+
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+
+class _Timer(object):
+
+    __slots__ = ('_phases', '_name', '_start')
+
+    def __init__(self, phases, name):
+        self._phases = phases
+        self._name = name
+
+    def __enter__(self):
+        self._start = clock()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._phases.append(Phase(self._name, self._start, clock()))
+
+
+class Timings(object):
+    """Record the phases of starting a program
+
+    Use the 'phase()' method as a context manager to time each phase.
+    """
+
+    def __init__(self, phases=()):
+        self.phases = list(phases)
+
+    def phase(self, name):
+        "Context manager recording the time taken by a named phase"
+        return _Timer(self.phases, name)
+
+    def record(self, name, start, end=None):
+        "Record a phase using existing timestamps"
+        end = clock() if end is None else end
+        self.phases.append(Phase(name, start, end))
+
+    def report(self, stream):
+        """Write the duration of each phase to a stream
+
+        Phases may be nested, so the reported total is the time from the
+        start of the first phase to the end of the last phase.
+        """
+        stream.write('begins timings:\n')
+        for phase in self.phases:
+            stream.write('  {0:<16} {1:10.3f} ms\n'.format(phase.name,
+                phase.duration * 1000))
+        if len(self.phases) > 0:
+            total = max(phase.end for phase in self.phases) - \
+                    min(phase.start for phase in self.phases)
+            stream.write('  {0:<16} {1:10.3f} ms\n'.format('total',
+                total * 1000))
@@ -1,7 +1,9 @@
 """Utility functions for begins"""
-from distutils.util import strtobool as _tobool
 from argparse import FileType as tofile
 
+_TRUE = frozenset(['y', 'yes', 't', 'true', 'on', '1'])
+_FALSE = frozenset(['n', 'no', 'f', 'false', 'off', '0'])
+
 def tobool(value):
     """Convert a string representation of truth to True or False.
 
@@ -11,7 +13,12 @@ def tobool(value):
     """
     if isinstance(value, bool):
         return value
-    return bool(_tobool(value))
+    lowered = value.lower()
+    if lowered in _TRUE:
+        return True
+    if lowered in _FALSE:
+        return False
+    raise ValueError("invalid truth value {0!r}".format(value))
 
 def tolist(value=None, sep=',', empty_strings=False):
     """Convert a string to a list.
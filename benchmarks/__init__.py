@@ -0,0 +1,5 @@
+"""Performance benchmarks for begins
+
+Run the benchmarks using 'python -m benchmarks'. Results can be saved as JSON
+and compared against results from another release.
+"""
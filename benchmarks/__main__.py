@@ -0,0 +1,102 @@
+"""Run benchmarks for begins, optionally saving or comparing JSON results
+
+The runner uses argparse directly, as the benchmarks start begins programs
+which can not be done from within a running begins program.
+"""
+from __future__ import absolute_import, division, print_function
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+
+import begin
+from benchmarks.scenarios import SCENARIOS
+
+
+def measure(func, repeat, budget):
+    "Time func, choosing a loop count that fits the time budget"
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= budget / repeat or number >= 1000000:
+            break
+        number *= 10
+    times = [elapsed] + timer.repeat(repeat - 1, number)
+    times = [t / number for t in times]
+    return number, min(times), sum(times) / len(times)
+
+
+def run(pattern, repeat, budget, maxsize):
+    "Run all scenarios matching pattern, yielding result dictionaries"
+    for name, scenario, sizes in SCENARIOS:
+        if pattern is not None and pattern not in name:
+            continue
+        for size in sizes:
+            if maxsize is not None and size > maxsize:
+                continue
+            func, cleanup = scenario(size)
+            try:
+                number, best, mean = measure(func, repeat, budget)
+            finally:
+                if cleanup is not None:
+                    cleanup()
+            yield {'name': name, 'size': size, 'number': number,
+                    'best': best, 'mean': mean}
+
+
+def compare(results, baseline):
+    "Yield the ratio of best times against a baseline for each result"
+    previous = dict(((r['name'], r['size']), r['best'])
+            for r in baseline['results'])
+    for result in results:
+        before = previous.get((result['name'], result['size']))
+        ratio = None if not before else result['best'] / before
+        yield result, ratio
+
+
+def main(output=None, baseline=None, pattern=None, repeat=5, budget=0.2,
+        maxsize=None):
+    "Benchmark parser construction and dispatch in begins"
+    results = []
+    for result in run(pattern, repeat, budget, maxsize):
+        results.append(result)
+        print('{name:<34} {size:>6} {best:>14.9f}s'.format(**result))
+        sys.stdout.flush()
+    report = {
+        'begins': begin.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'results': results,
+    }
+    if output is not None:
+        with open(output, 'w') as stream:
+            json.dump(report, stream, indent=2, sort_keys=True)
+    if baseline is not None:
+        with open(baseline) as stream:
+            baseline = json.load(stream)
+        print('\nCompared with begins {0}:'.format(baseline['begins']))
+        for result, ratio in compare(results, baseline):
+            text = 'n/a' if ratio is None else '{0:.2f}x'.format(ratio)
+            print('{0:<34} {1:>6} {2:>8}'.format(result['name'],
+                result['size'], text))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+            description=main.__doc__)
+    parser.add_argument('--output', help='Write JSON results to file')
+    parser.add_argument('--baseline',
+            help='Compare against JSON results from file')
+    parser.add_argument('--pattern', help='Only run matching benchmarks')
+    parser.add_argument('--repeat', type=int, default=5,
+            help='Number of timing repetitions (default: %(default)s)')
+    parser.add_argument('--budget', type=float, default=0.2,
+            help='Seconds to spend timing each benchmark (default: %(default)s)')
+    parser.add_argument('--maxsize', type=int,
+            help='Skip benchmarks larger than this size')
+    main(**vars(parser.parse_args()))
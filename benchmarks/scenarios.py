@@ -0,0 +1,128 @@
+"Benchmark scenarios for parser construction and dispatch"
+from __future__ import absolute_import, division, print_function
+import os
+import tempfile
+
+try:
+    from inspect import signature
+except ImportError:
+    from funcsigs import signature
+
+from begin import cmdline, extensions, main, subcommands
+
+__all__ = ['SCENARIOS']
+
+
+def make_function(name, params, doc=None):
+    "Create a function accepting a number of keyword parameters"
+    args = ', '.join("p{0}='{0}'".format(n) for n in range(params))
+    namespace = {}
+    exec('def {0}({1}):\n    return None'.format(name, args), namespace)
+    func = namespace[name]
+    func.__doc__ = doc
+    return func
+
+
+class NullExtension(extensions.Extension):
+    "Extension adding a single option and doing nothing when run"
+
+    def __init__(self, func, index):
+        extensions.Extension.__init__(self, func)
+        self.index = index
+
+    def add_arguments(self, parser, defaults):
+        parser.add_argument('--ext{0}'.format(self.index),
+                default=defaults.from_name('ext{0}'.format(self.index),
+                    section='extensions', default=None))
+
+    def run(self, opts):
+        getattr(opts, 'ext{0}'.format(self.index))
+
+
+def make_collector(commands):
+    collector = subcommands.Collector()
+    for n in range(commands):
+        collector.register(make_function('sub{0}'.format(n), 3,
+            'Sub-command {0}'.format(n)))
+    return collector
+
+
+def create_parser_params(size):
+    func = make_function('main', size)
+    collector = subcommands.Collector()
+    return lambda: cmdline.create_parser(func, collector=collector), None
+
+
+def create_parser_subcommands(size, lazy=False):
+    func = make_function('main', 1)
+    collector = make_collector(size)
+    return lambda: cmdline.create_parser(func, collector=collector,
+            lazy_subcommands=lazy), None
+
+
+def create_parser_subcommands_lazy(size):
+    return create_parser_subcommands(size, lazy=True)
+
+
+def create_parser_extensions(size):
+    func = make_function('main', 1)
+    for n in range(size):
+        func = NullExtension(func, n)
+    collector = subcommands.Collector()
+    return lambda: cmdline.create_parser(func, collector=collector), None
+
+
+def create_parser_config(size):
+    handle, path = tempfile.mkstemp(suffix='.cfg')
+    with os.fdopen(handle, 'w') as config:
+        config.write('[main]\n')
+        for n in range(size):
+            config.write('p{0} = value{0}\n'.format(n))
+    func = make_function('main', 10)
+    collector = subcommands.Collector()
+    return (lambda: cmdline.create_parser(func, collector=collector,
+        config_file=path), lambda: os.remove(path))
+
+
+def start_params(size):
+    func = make_function('main', size)
+    prog = main.Program(func, collector=subcommands.Collector())
+    args = ['--p0', 'value']
+    return lambda: prog.start(args), None
+
+
+def start_subcommands(size):
+    func = make_function('main', 1)
+    prog = main.Program(func, collector=make_collector(size))
+    args = ['sub0', '--p0', 'value']
+    return lambda: prog.start(args), None
+
+
+def start_chain(size):
+    func = make_function('main', 1)
+    prog = main.Program(func, cmd_delim='+', collector=make_collector(1))
+    args = ['sub0']
+    for n in range(1, size):
+        args.extend(['+', 'sub0'])
+    return lambda: prog.start(args), None
+
+
+def call_function_params(size):
+    func = make_function('main', size)
+    funcsig = signature(func)
+    opts = cmdline.argparse.Namespace(**dict(('p{0}'.format(n), n)
+        for n in range(size)))
+    return lambda: cmdline.call_function(func, funcsig, opts), None
+
+
+SCENARIOS = [
+    ('create_parser.params', create_parser_params, (10, 100, 1000)),
+    ('create_parser.subcommands', create_parser_subcommands, (1, 10, 100, 1000)),
+    ('create_parser.subcommands_lazy', create_parser_subcommands_lazy, (1, 10, 100, 1000)),
+    ('create_parser.extensions', create_parser_extensions, (1, 10, 100)),
+    ('create_parser.config', create_parser_config, (10, 100, 1000, 10000)),
+    ('start.params', start_params, (10, 100, 1000)),
+    ('start.subcommands', start_subcommands, (1, 10, 100, 1000)),
+    ('start.chain', start_chain, (1, 10, 100, 1000)),
+    ('call_function.params', call_function_params, (10, 100, 1000)),
+]
@@ -1,5 +1,6 @@
 from __future__ import absolute_import, division, print_function
 import mock
+import subprocess
 import sys
 
 try:
@@ -27,6 +28,16 @@ class TestBegins(unittest.TestCase):
             for collector in begin.subcommands.COLLECTORS.values():
                 collector.clear()
 
+    def test_lazy_imports(self):
+        heavy = ['cgitb', 'configparser', 'distutils', 'importlib.metadata',
+                'json', 'logging', 'logging.handlers', 'pickle',
+                'pkg_resources', 'platform']
+        code = ("import sys; import begin; "
+                "print(' '.join(name for name in {0!r} if name in sys.modules))")
+        output = subprocess.check_output([sys.executable, '-c',
+            code.format(heavy)])
+        self.assertEqual(output.decode('ascii').split(), [])
+
 
 if __name__ == '__main__':
     unittest.begin()
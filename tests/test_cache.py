@@ -0,0 +1,65 @@
+from __future__ import absolute_import, division, print_function
+import mock
+import os
+import pickle
+import shutil
+import tempfile
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from begin import cache
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        self.environ = mock.patch.dict(os.environ,
+                {'BEGIN_CACHE_DIR': os.path.join(self.cachedir, 'begins')})
+        self.environ.start()
+
+    def tearDown(self):
+        self.environ.stop()
+        shutil.rmtree(self.cachedir)
+
+    def test_directory_override(self):
+        self.assertEqual(cache.directory(),
+                os.path.join(self.cachedir, 'begins'))
+
+    def test_directory_disabled(self):
+        os.environ['BEGIN_CACHE_DIR'] = ''
+        self.assertIsNone(cache.directory())
+        cache.store('name', 'key', 'value')
+        self.assertIsNone(cache.load('name', 'key'))
+
+    def test_fingerprint(self):
+        self.assertEqual(cache.fingerprint('a', 1), cache.fingerprint('a', 1))
+        self.assertNotEqual(cache.fingerprint('a', 1), cache.fingerprint('a', 2))
+
+    def test_missing(self):
+        self.assertIsNone(cache.load('name', 'key'))
+
+    def test_round_trip(self):
+        cache.store('name', 'key', {'a': [1, 2]})
+        self.assertEqual(cache.load('name', 'key'), {'a': [1, 2]})
+
+    def test_stale_key(self):
+        cache.store('name', 'key', 'value')
+        self.assertIsNone(cache.load('name', 'other'))
+
+    def test_corrupt(self):
+        cache.store('name', 'key', 'value')
+        with open(os.path.join(cache.directory(), 'name'), 'wb') as cached:
+            cached.write(b'not json')
+        self.assertIsNone(cache.load('name', 'key'))
+
+    def test_pickle_codec(self):
+        cache.store('name', 'key', Ellipsis, codec=pickle)
+        self.assertIs(cache.load('name', 'key', codec=pickle), Ellipsis)
+
+
+if __name__ == '__main__':
+    unittest.begin()
@@ -2,15 +2,15 @@ from __future__ import absolute_import, division, print_function
 import cgitb
 import mock
 import os
+import shutil
 import sys
+import tempfile
 
 try:
     import unittest2 as unittest
 except ImportError:
     import unittest
 
-import pkg_resources
-
 from begin import cmdline
 from begin import extensions
 from begin import subcommands
@@ -199,6 +199,48 @@ def test_variable_positional_with_annotation(self):
         self.assertEqual(len(parser._action_groups), 3)
         self.assertIn('subcmd', parser.format_help())
 
+    @mock.patch('os.path.expanduser')
+    def test_configfile_section(self, expanduser):
+        def other(arg, unk):
+            pass
+        expanduser.return_value = os.path.join(os.curdir, 'tests')
+        parser = cmdline.create_parser(other, config_file='config_test.cfg',
+                config_section='main')
+        self.assertEqual(parser._optionals._actions[1].default, 'value')
+
+    def test_lazy_subcommand(self):
+        @subcommands.subcommand
+        def subcmd(opt='default'):
+            "subcommand help"
+        def main():
+            pass
+        parser = cmdline.create_parser(main, lazy_subcommands=True)
+        subparsers = parser._subparsers._group_actions[0]
+        subparser = subparsers.choices['subcmd']
+        self.assertEqual(len(subparser._actions), 1)
+        self.assertIn('subcommand help', parser.format_help())
+        opts = parser.parse_args(['subcmd', '--opt', 'value'])
+        self.assertEqual(len(subparser._actions), 2)
+        self.assertEqual(opts.opt, 'value')
+        opts = parser.parse_args(['subcmd'])
+        self.assertEqual(len(subparser._actions), 2)
+        self.assertEqual(opts.opt, 'default')
+
+    def test_lazy_subcommand_unused(self):
+        @subcommands.subcommand
+        def first(opt='default'):
+            pass
+        @subcommands.subcommand
+        def second(opt='default'):
+            pass
+        def main():
+            pass
+        parser = cmdline.create_parser(main, lazy_subcommands=True)
+        parser.parse_args(['first'])
+        subparsers = parser._subparsers._group_actions[0]
+        self.assertEqual(len(subparsers.choices['first']._actions), 2)
+        self.assertEqual(len(subparsers.choices['second']._actions), 1)
+
     def test_subcommand_group(self):
         @subcommands.subcommand(group='named.collector')
         def subcmd():
@@ -209,15 +251,15 @@ def test_variable_positional_with_annotation(self):
         self.assertEqual(len(parser._action_groups), 3)
         self.assertIn('subcmd', parser.format_help())
 
-    @mock.patch('pkg_resources.iter_entry_points')
-    def test_plugins(self, iep):
+    @mock.patch('begin.subcommands.load_entry_point')
+    @mock.patch('begin.subcommands.entry_points')
+    def test_plugins(self, entry_points, load_entry_point):
         def main():
             pass
         def subcmd():
             pass
-        def entry_points(group, *args):
-            yield subcmd
-        iep.side_effect = entry_points
+        entry_points.return_value = [('subcmd', 'module:subcmd')]
+        load_entry_point.return_value = subcmd
         parser = cmdline.create_parser(main, plugins='entry.point')
         self.assertEqual(len(parser._action_groups), 3)
         self.assertIn('subcmd', parser.format_help())
@@ -263,6 +305,66 @@ def test_variable_positional_with_annotation(self):
         self.assertNotIn('SUBCOMMAND_DESC', parser.format_help())
 
 
+class TestParserCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        self.environ = mock.patch.dict(os.environ,
+                {'BEGIN_CACHE_DIR': self.cachedir})
+        self.environ.start()
+
+    def tearDown(self):
+        self.environ.stop()
+        shutil.rmtree(self.cachedir)
+        for collector in subcommands.COLLECTORS.values():
+            collector.clear()
+
+    def test_cached_parser(self):
+        @subcommands.subcommand
+        def subcmd(a, flag=False):
+            pass
+        @extensions.Logging
+        def main(c='c'):
+            pass
+        first = cmdline.create_parser(main, parser_cache=True)
+        with mock.patch('begin.cmdline.populate_parser') as populate:
+            second = cmdline.create_parser(main, parser_cache=True)
+            self.assertFalse(populate.called)
+        self.assertIsNot(first, second)
+        self.assertEqual(first.format_help(), second.format_help())
+        opts = second.parse_args(['-c', 'C', 'subcmd', 'A', '--flag'])
+        self.assertEqual((opts.c, opts.a, opts.flag), ('C', 'A', True))
+        opts = second.parse_args(['subcmd', 'A'])
+        self.assertEqual((opts.c, opts.flag), ('c', False))
+
+    def test_environment_invalidates(self):
+        def main(b='b'):
+            pass
+        cmdline.create_parser(main, env_prefix='X_', parser_cache=True)
+        os.environ['X_B'] = 'env'
+        parser = cmdline.create_parser(main, env_prefix='X_', parser_cache=True)
+        self.assertEqual(parser.parse_args([]).b, 'env')
+
+    def test_arguments_invalidate(self):
+        def main(b='b'):
+            pass
+        cmdline.create_parser(main, parser_cache=True)
+        parser = cmdline.create_parser(main, short_args=False,
+                parser_cache=True)
+        self.assertNotIn('-b', parser._option_string_actions)
+
+    def test_unpicklable_parser(self):
+        def main(b='b'):
+            pass
+        formatter_class = lambda prog: cmdline.argparse.HelpFormatter(prog)
+        parser = cmdline.create_parser(main, parser_cache=True,
+                formatter_class=formatter_class)
+        parser.add_argument('--local', type=lambda x: x)
+        parser = cmdline.create_parser(main, parser_cache=True,
+                formatter_class=formatter_class)
+        self.assertEqual(parser.parse_args([]).b, 'b')
+
+
 class TestApplyOptions(unittest.TestCase):
 
     def setUp(self):
@@ -373,5 +475,75 @@ def test_keyword_only(self):
         self.assertEqual('blue', value)
 
 
+class TestInvocationPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.opts = Options()
+
+    def test_invocation_steps(self):
+        def main(a, b=None, *c):
+            return (a, b, c)
+        invocation = cmdline.Invocation(main, cmdline.signature(main))
+        self.assertEqual(invocation.steps, (('a', cmdline._POSITIONAL),
+            ('b', cmdline._POSITIONAL), ('c', cmdline._VARIADIC)))
+        self.opts.a, self.opts.b, self.opts.c = 1, 2, [3, 4]
+        self.assertEqual(invocation(self.opts), (1, 2, (3, 4)))
+        self.opts.c = cmdline.NODEFAULT
+        self.assertEqual(invocation(self.opts), (1, 2, ()))
+
+    def test_invocation_variable_keywords(self):
+        def main(**kwargs):
+            pass
+        with self.assertRaises(cmdline.CommandLineError):
+            cmdline.Invocation(main, cmdline.signature(main))
+
+    def test_plan_extensions(self):
+        @extensions.Tracebacks
+        @extensions.Logging
+        def main(a):
+            return a
+        plan = cmdline.InvocationPlan(main, subcommands.Collector())
+        self.assertEqual([type(ext) for ext in plan.extensions],
+                [extensions.Tracebacks, extensions.Logging])
+        self.assertEqual(plan.main.steps, (('a', cmdline._POSITIONAL),))
+        self.opts.a = 1
+        self.assertEqual(plan.main(self.opts), 1)
+
+    def test_plan_subcommands(self):
+        collector = subcommands.Collector()
+        @subcommands.subcommand(collector=collector)
+        def subcmd(b):
+            return b
+        def main():
+            pass
+        plan = cmdline.InvocationPlan(main, collector)
+        self.assertIn('subcmd', plan._subcommands)
+        self.assertIs(plan.subcommand('subcmd'), plan.subcommand('subcmd'))
+        self.opts.b = 2
+        self.assertEqual(plan.subcommand('subcmd')(self.opts), 2)
+
+    def test_plan_lazy_subcommands(self):
+        collector = subcommands.Collector()
+        @subcommands.subcommand(collector=collector)
+        def subcmd():
+            pass
+        def main():
+            pass
+        plan = cmdline.InvocationPlan(main, collector, eager=False)
+        self.assertNotIn('subcmd', plan._subcommands)
+        plan.subcommand('subcmd')
+        self.assertIn('subcmd', plan._subcommands)
+
+    def test_apply_plan(self):
+        def main(a):
+            return a
+        plan = cmdline.InvocationPlan(main, subcommands.Collector())
+        self.opts.a = 'planned'
+        with mock.patch('begin.cmdline.signature') as signature:
+            value = cmdline.apply_options(main, self.opts, plan=plan)
+            self.assertFalse(signature.called)
+        self.assertEqual(value, 'planned')
+
+
 if __name__ == "__main__":
     unittest.begin()
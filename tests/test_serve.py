@@ -0,0 +1,135 @@
+from __future__ import absolute_import, division, print_function
+import mock
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import begin
+from begin import serve
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'requires Unix domain sockets')
+class TestServe(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.address = os.path.join(self.tempdir, 'begins.sock')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+        for collector in begin.subcommands.COLLECTORS.values():
+            collector.clear()
+
+    def serve(self, program):
+        server = serve.make_server(program, self.address)
+        thread = threading.Thread(target=server.serve_forever,
+                kwargs={'poll_interval': 0.05})
+        thread.start()
+        def stop():
+            server.shutdown()
+            thread.join()
+            server.server_close()
+        self.addCleanup(stop)
+        return server
+
+    def request(self, args, env=None, cwd=None):
+        read_out, write_out = os.pipe()
+        read_err, write_err = os.pipe()
+        with open(os.devnull) as stdin:
+            try:
+                status = serve.request(self.address, args, env=env, cwd=cwd,
+                        fds=(stdin.fileno(), write_out, write_err))
+            finally:
+                os.close(write_out)
+                os.close(write_err)
+        with os.fdopen(read_out) as stdout:
+            with os.fdopen(read_err) as stderr:
+                return status, stdout.read(), stderr.read()
+
+    def test_request(self):
+        @begin.start
+        def main(name='world'):
+            print('hello ' + name)
+            print(os.getcwd())
+            print(os.environ.get('GREETING'))
+        self.serve(main)
+        status, out, err = self.request(['--name', 'begins'],
+                env={'GREETING': 'hi'}, cwd=self.tempdir)
+        self.assertEqual(status, 0)
+        self.assertEqual(out.splitlines(), ['hello begins',
+            os.path.realpath(self.tempdir), 'hi'])
+
+    def test_exit_code(self):
+        @begin.start
+        def main(code):
+            sys.exit(int(code))
+        self.serve(main)
+        self.assertEqual(self.request(['3'])[0], 3)
+        self.assertEqual(self.request(['0'])[0], 0)
+
+    def test_parser_error(self):
+        @begin.start
+        def main(code):
+            pass
+        self.serve(main)
+        status, out, err = self.request([])
+        self.assertEqual(status, 2)
+        self.assertIn('usage:', err)
+
+    def test_exception(self):
+        @begin.start
+        def main():
+            raise ValueError('broken')
+        self.serve(main)
+        status, out, err = self.request([])
+        self.assertEqual(status, 1)
+        self.assertIn('ValueError: broken', err)
+
+    def test_isolated_requests(self):
+        state = []
+        @begin.start
+        def main(value):
+            state.append(value)
+            print(len(state))
+        self.serve(main)
+        self.assertEqual(self.request(['a'])[1], '1\n')
+        self.assertEqual(self.request(['b'])[1], '1\n')
+        self.assertEqual(state, [])
+
+    def test_address_in_use(self):
+        @begin.start
+        def main():
+            pass
+        self.serve(main)
+        with self.assertRaises(socket.error):
+            serve.make_server(main, self.address)
+
+    def test_stale_socket(self):
+        @begin.start
+        def main():
+            pass
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.address)
+        stale.close()
+        self.serve(main)
+        self.assertEqual(self.request([])[0], 0)
+
+    @mock.patch('begin.serve.serve')
+    def test_start_control_option(self, serve_function):
+        @begin.start
+        def main():
+            pass
+        main.start(['--begin-serve', self.address])
+        serve_function.assert_called_once_with(main, self.address)
+
+
+if __name__ == '__main__':
+    unittest.begin()
@@ -4,14 +4,13 @@ import logging
 import mock
 import os
 import sys
+import tempfile
 
 try:
     import unittest2 as unittest
 except ImportError:
     import unittest
 
-import pkg_resources
-
 import begin
 
 
@@ -248,8 +247,9 @@ class TestStart(unittest.TestCase):
             sys.argv = orig_argv
             globals()['__name__'] = orig_name
 
-    @mock.patch('pkg_resources.iter_entry_points')
-    def test_plugins(self, iep):
+    @mock.patch('begin.subcommands.load_entry_point')
+    @mock.patch('begin.subcommands.entry_points')
+    def test_plugins(self, entry_points, load_entry_point):
         epilogue = mock.Mock()
         target = mock.Mock()
         try:
@@ -259,9 +259,8 @@ class TestStart(unittest.TestCase):
             globals()['__name__'] = "__main__"
             def subcmd():
                 target()
-            def entry_points(group, *args):
-                yield subcmd
-            iep.side_effect = entry_points
+            entry_points.return_value = [('subcmd', 'module:subcmd')]
+            load_entry_point.return_value = subcmd
             @begin.start(plugins='entry.points')
             def main():
                 epilogue()
@@ -376,6 +375,98 @@ class TestStart(unittest.TestCase):
             sys.argv = orig_argv
             globals()['__name__'] = orig_name
 
+    def test_timings(self):
+        @begin.start
+        def main(a='a'):
+            pass
+        with mock.patch('sys.stderr') as stderr:
+            main.start(['-a', 'b'])
+            self.assertFalse(stderr.write.called)
+        phases = [phase.name for phase in begin.context.timings]
+        self.assertEqual(phases, ['import', 'defaults', 'create_parser',
+            'plan', 'parse_args', 'extensions', 'main'])
+        for phase in begin.context.timings:
+            self.assertGreaterEqual(phase.duration, 0)
+
+    def test_timings_report(self):
+        target = mock.Mock()
+        @begin.start
+        def main(a='a'):
+            target(a)
+        with mock.patch('sys.stderr') as stderr:
+            main.start(['--begin-timings', '-a', 'b'])
+            self.assertTrue(stderr.write.called)
+        target.assert_called_once_with('b')
+
+    def test_timings_environment(self):
+        @begin.start
+        def main():
+            pass
+        with mock.patch.dict(os.environ, {'BEGIN_TIMINGS': '1'}):
+            with mock.patch('sys.stderr') as stderr:
+                main.start([])
+                self.assertTrue(stderr.write.called)
+
+    def test_start_many(self):
+        @begin.start
+        def main(value):
+            return int(value)
+        results = list(main.start_many([['1'], ('2',), ['x']]))
+        self.assertEqual([r.args for r in results], [['1'], ['2'], ['x']])
+        self.assertEqual([r.value for r in results[:2]], [1, 2])
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[2].error, ValueError)
+
+    def test_start_many_parser_error(self):
+        @begin.start
+        def main(value):
+            return value
+        with mock.patch('sys.stderr'):
+            results = list(main.start_many([[], ['a']]))
+        self.assertIsInstance(results[0].error, SystemExit)
+        self.assertEqual(results[1].value, 'a')
+
+    def test_start_many_lazy(self):
+        consumed = []
+        def commands():
+            for value in ('a', 'b'):
+                consumed.append(value)
+                yield [value]
+        @begin.start
+        def main(value):
+            return value
+        results = main.start_many(commands())
+        self.assertEqual(next(results).value, 'a')
+        self.assertEqual(consumed, ['a'])
+
+    def test_batch_file(self):
+        target = mock.Mock()
+        @begin.start
+        def main(value, flag=False):
+            target(value, flag)
+        handle, path = tempfile.mkstemp()
+        try:
+            with os.fdopen(handle, 'w') as batch:
+                batch.write('a\n\n# comment\n"b c"\n')
+            main.start(['--begin-batch', path, '--flag'])
+        finally:
+            os.remove(path)
+        self.assertEqual(target.call_args_list,
+                [mock.call('a', True), mock.call('b c', True)])
+
+    def test_batch_stdin_failures(self):
+        @begin.start
+        def main(value):
+            if value == 'bad':
+                raise ValueError('bad value')
+        stdin = mock.Mock()
+        stdin.__iter__ = mock.Mock(return_value=iter(['ok\n', 'bad\n']))
+        with mock.patch('sys.stdin', stdin):
+            with mock.patch('sys.stderr') as stderr:
+                with self.assertRaises(SystemExit):
+                    main.start(['--begin-batch', '-'])
+        stderr.write.assert_called_once_with('-:2: bad value' + os.linesep)
+
 
 if __name__ == '__main__':
     unittest.begin()
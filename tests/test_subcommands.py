@@ -1,13 +1,14 @@
 from __future__ import absolute_import, division, print_function
 import mock
+import os
+import shutil
+import tempfile
 
 try:
     import unittest2 as unittest
 except ImportError:
     import unittest
 
-import pkg_resources
-
 import begin
 
 
@@ -51,17 +52,26 @@ class TestSubCommand(unittest.TestCase):
             pass
         self.assertIs(begin.subcommands.COLLECTORS[None].get('function'), function)
 
-    @mock.patch('pkg_resources.iter_entry_points')
-    def test_entry_points(self, iep):
+    @mock.patch('begin.subcommands.load_entry_point')
+    @mock.patch('begin.subcommands.entry_points')
+    def test_entry_points(self, entry_points, load_entry_point):
         def function():
             pass
-        def entry_points(group, *args):
-            yield function
-        iep.side_effect = entry_points
+        entry_points.return_value = [('function', 'module:function')]
+        load_entry_point.return_value = function
         collector = begin.subcommands.Collector()
         collector.load_plugins('entry.point')
         self.assertEqual(list(collector.commands()), [function])
 
+    def test_load_entry_point(self):
+        self.assertIs(begin.subcommands.load_entry_point('os.path:join'),
+                os.path.join)
+        self.assertIs(begin.subcommands.load_entry_point('os.path'), os.path)
+
+    def test_load_entry_point_extras(self):
+        self.assertIs(begin.subcommands.load_entry_point('os:path.join [extra]'),
+                os.path.join)
+
     def test_named_collector(self):
         @begin.subcommand(group='named.collector')
         def function():
@@ -77,3 +87,48 @@ class TestSubCommand(unittest.TestCase):
             pass
         self.assertIn('subcmd', begin.subcommands.COLLECTORS[None])
         self.assertNotIn('function', begin.subcommands.COLLECTORS[None])
+
+
+class TestEntryPoints(unittest.TestCase):
+
+    def setUp(self):
+        self.cachedir = tempfile.mkdtemp()
+        self.environ = mock.patch.dict(os.environ,
+                {'BEGIN_CACHE_DIR': self.cachedir})
+        self.environ.start()
+        begin.subcommands._ENTRY_POINTS = None
+
+    def tearDown(self):
+        self.environ.stop()
+        shutil.rmtree(self.cachedir)
+        begin.subcommands._ENTRY_POINTS = None
+
+    @mock.patch('begin.subcommands._scan_entry_points')
+    def test_find_group(self, scan):
+        scan.return_value = {'entry.point': [['join', 'os.path:join']]}
+        found = begin.subcommands.entry_points('entry.point')
+        self.assertEqual(found, [('join', 'os.path:join')])
+        self.assertEqual(begin.subcommands.entry_points('other'), [])
+
+    @mock.patch('begin.subcommands._scan_entry_points')
+    def test_cached_index(self, scan):
+        scan.return_value = {'entry.point': [['join', 'os.path:join']]}
+        begin.subcommands.entry_points('entry.point')
+        begin.subcommands._ENTRY_POINTS = None
+        found = begin.subcommands.entry_points('entry.point')
+        self.assertEqual(scan.call_count, 1)
+        self.assertEqual(found, [('join', 'os.path:join')])
+
+    @mock.patch('begin.subcommands._path_mtimes')
+    @mock.patch('begin.subcommands._scan_entry_points')
+    def test_invalidated_index(self, scan, mtimes):
+        scan.return_value = {}
+        mtimes.return_value = [('/site-packages', 1.0)]
+        begin.subcommands.entry_points('entry.point')
+        mtimes.return_value = [('/site-packages', 2.0)]
+        begin.subcommands.entry_points('entry.point')
+        self.assertEqual(scan.call_count, 2)
+
+    def test_scan_installed(self):
+        index = begin.subcommands._scan_entry_points()
+        self.assertIsInstance(index, dict)
@@ -0,0 +1,62 @@
+from __future__ import absolute_import, division, print_function
+import mock
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    from io import StringIO
+except ImportError:
+    from StringIO import StringIO
+
+from begin import timings
+
+
+class TestTimings(unittest.TestCase):
+
+    def test_phase(self):
+        record = timings.Timings()
+        with record.phase('alpha'):
+            pass
+        self.assertEqual(len(record.phases), 1)
+        self.assertEqual(record.phases[0].name, 'alpha')
+        self.assertLessEqual(record.phases[0].start, record.phases[0].end)
+
+    def test_phase_exception(self):
+        record = timings.Timings()
+        with self.assertRaises(ValueError):
+            with record.phase('alpha'):
+                raise ValueError()
+        self.assertEqual(len(record.phases), 1)
+
+    def test_record(self):
+        record = timings.Timings()
+        record.record('alpha', 1.0, 3.5)
+        self.assertEqual(record.phases, [timings.Phase('alpha', 1.0, 3.5)])
+        self.assertEqual(record.phases[0].duration, 2.5)
+
+    def test_copy_phases(self):
+        first = timings.Timings()
+        first.record('alpha', 1.0, 2.0)
+        second = timings.Timings(first.phases)
+        second.record('beta', 2.0, 3.0)
+        self.assertEqual(len(first.phases), 1)
+        self.assertEqual(len(second.phases), 2)
+
+    def test_report(self):
+        record = timings.Timings()
+        record.record('alpha', 1.0, 2.0)
+        record.record('beta', 1.5, 3.0)
+        stream = StringIO()
+        record.report(stream)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertIn('alpha', lines[1])
+        self.assertIn('1000.000 ms', lines[1])
+        self.assertIn('2000.000 ms', lines[3])
+
+
+if __name__ == '__main__':
+    unittest.begin()
@@ -10,6 +10,23 @@ except ImportError:
 from begin import utils
 
 
+class TestToBool(unittest.TestCase):
+
+    def test_true_strings(self):
+        for value in ('y', 'Yes', 't', 'TRUE', 'on', '1'):
+            self.assertIs(utils.tobool(value), True)
+
+    def test_false_strings(self):
+        for value in ('n', 'No', 'f', 'FALSE', 'off', '0'):
+            self.assertIs(utils.tobool(value), False)
+
+    def test_bool(self):
+        self.assertIs(utils.tobool(True), True)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, utils.tobool, 'maybe')
+
+
 class TestToList(unittest.TestCase):
 
     def test_empty_list(self):